@@ -1,9 +1,11 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import folium
-from streamlit_folium import folium_static
+from folium.features import DivIcon
+from folium.plugins import Draw, LocateControl
 import pandas as pd
-from geopy.distance import geodesic
-from folium.plugins import Draw, locate_control
+import numpy as np
+from pyproj import Geod
 
 # Set page configuration
 st.set_page_config(
@@ -27,11 +29,83 @@ locations = pd.DataFrame({
     'radius': [50, 70, 60, 80, 65]  # radius in meters for each location
 })
 
+# Column arrays for the hot paths
+NAMES = locations['name'].to_numpy()
+LATS = locations['latitude'].to_numpy()
+LONS = locations['longitude'].to_numpy()
+TYPES = locations['type'].to_numpy()
+RADII = locations['radius'].to_numpy()
+
+def geodesic_matrix(lats, lons):
+    """Pairwise WGS84 geodesic distances in meters between the given points"""
+    n = len(lats)
+    lats1, lats2 = np.repeat(lats, n), np.tile(lats, n)
+    lons1, lons2 = np.repeat(lons, n), np.tile(lons, n)
+    _, _, d = Geod(ellps='WGS84').inv(lons1, lats1, lons2, lats2)
+    return np.asarray(d, dtype=np.float32).reshape(n, n)
+
+@st.cache_resource
+def _distance_matrix():
+    """Distance matrix between all locations, built once per process"""
+    return geodesic_matrix(LATS, LONS)
+
+# Streamlit re-executes this script on every rerun, so the matrix is cached
+DIST = _distance_matrix()
+
+# Lowercase name index for location search
+NAMES_LOWER = tuple(name.lower() for name in NAMES)
+NAME_TO_IDX = {name: i for i, name in enumerate(NAMES_LOWER)}
+
+# Marker popup HTML, built once since locations are static
+POPUPS = [
+    f"<b>{r.name}</b><br>Type: {r.type}<br>Lat: {r.latitude:.4f}<br>Lon: {r.longitude:.4f}"
+    for r in locations.itertuples()
+]
+
+# Plain (name, lat, lon, type, radius, popup) tuples for building map markers
+MARKERS = list(zip(
+    NAMES.tolist(),
+    LATS.tolist(),
+    LONS.tolist(),
+    TYPES.tolist(),
+    RADII.tolist(),
+    POPUPS
+))
+
+def search_locations(search_term):
+    """Return row positions of locations whose name contains the search term"""
+    q = search_term.lower()
+    return [i for i, name in enumerate(NAMES_LOWER) if q in name]
+
+@st.cache_data
+def _filter_by_type(location_type):
+    """Return the names of locations of the given type ("All" for every location)"""
+    if location_type == "All":
+        return tuple(NAMES)
+    return tuple(NAMES[TYPES == location_type])
+
+# Glowing highlight marker; its pulse animation lives in PULSE_CSS
+GLOW_ICON_HTML = (
+    '<div style="width: 20px; height: 20px; background-color: #FFD700; '
+    'border-radius: 50%; box-shadow: 0 0 20px #FFD700; animation: pulse 2s infinite;"></div>'
+)
+PULSE_CSS = """
+    <style>
+        @keyframes pulse {
+            0% { box-shadow: 0 0 0 0 rgba(255, 215, 0, 0.7); }
+            70% { box-shadow: 0 0 0 20px rgba(255, 215, 0, 0); }
+            100% { box-shadow: 0 0 0 0 rgba(255, 215, 0, 0); }
+        }
+    </style>
+"""
+
+# Bounds of the dark overlay, adjusted to cover university area
+DARK_BOUNDS = [[-0.3950, 36.9600], [-0.3900, 36.9700]]
+
 def create_dark_overlay(map_obj):
     """Create a dark overlay for the entire map"""
-    bounds = [[-0.3950, 36.9600], [-0.3900, 36.9700]]  # Adjusted to cover university area
     folium.Rectangle(
-        bounds=bounds,
+        bounds=DARK_BOUNDS,
         color='#000000',
         fill=True,
         fillColor='#000000',
@@ -39,79 +113,28 @@ def create_dark_overlay(map_obj):
         weight=0
     ).add_to(map_obj)
 
-def create_map(center_lat=-0.3923, center_lon=36.9634, zoom=17, highlight_name=None):
-    """Create a Folium map with highlighted location"""
+def _build_base_map(center_lat, center_lon, zoom, highlight_name=None):
+    """Build the base map with location markers and controls, leaving out the highlighted one"""
     m = folium.Map(
         location=[center_lat, center_lon],
         zoom_start=zoom,
-        tiles="OpenStreetMap"
+        tiles="OpenStreetMap",
+        prefer_canvas=True
     )
     
     # Add dark overlay if a location is highlighted
     if highlight_name:
         create_dark_overlay(m)
     
-    # Add location markers
-    for idx, row in locations.iterrows():
-        is_highlighted = highlight_name and row['name'] == highlight_name
-        
-        # Create marker
-        marker = folium.Marker(
-            [row['latitude'], row['longitude']],
-            popup=f"""
-                <b>{row['name']}</b><br>
-                Type: {row['type']}<br>
-                Lat: {row['latitude']:.4f}<br>
-                Lon: {row['longitude']:.4f}
-            """,
-            tooltip=row['name']
-        )
-        
-        # If this is the highlighted location
-        if is_highlighted:
-            # Add highlight circle
-            folium.Circle(
-                location=[row['latitude'], row['longitude']],
-                radius=row['radius'],
-                color='#FFD700',
-                fill=True,
-                fillColor='#FFD700',
-                fillOpacity=0.3,
-                weight=2
-            ).add_to(m)
-            
-            # Add glowing marker
-            icon_html = f'''
-                <div style="
-                    width: 20px;
-                    height: 20px;
-                    background-color: #FFD700;
-                    border-radius: 50%;
-                    box-shadow: 0 0 20px #FFD700;
-                    animation: pulse 2s infinite;
-                ">
-                </div>
-                <style>
-                    @keyframes pulse {{
-                        0% {{ box-shadow: 0 0 0 0 rgba(255, 215, 0, 0.7); }}
-                        70% {{ box-shadow: 0 0 0 20px rgba(255, 215, 0, 0); }}
-                        100% {{ box-shadow: 0 0 0 0 rgba(255, 215, 0, 0); }}
-                    }}
-                </style>
-            '''
-            marker = folium.Marker(
-                [row['latitude'], row['longitude']],
-                popup=f"""
-                    <b>{row['name']}</b><br>
-                    Type: {row['type']}<br>
-                    Lat: {row['latitude']:.4f}<br>
-                    Lon: {row['longitude']:.4f}
-                """,
-                tooltip=row['name'],
-                icon=DivIcon(html=icon_html)
-            )
-            
-        marker.add_to(m)
+    # Add location markers; the highlighted one gets its glowing marker instead
+    for name, lat, lon, typ, radius, popup in MARKERS:
+        if name == highlight_name:
+            continue
+        folium.Marker(
+            [lat, lon],
+            popup=popup,
+            tooltip=name
+        ).add_to(m)
     
     # Add drawing and location controls
     Draw(
@@ -127,18 +150,64 @@ def create_map(center_lat=-0.3923, center_lon=36.9634, zoom=17, highlight_name=N
         }
     ).add_to(m)
     
-    Locate().add_to(m)
+    LocateControl().add_to(m)
     
     return m
 
+def create_map(center_lat=-0.3923, center_lon=36.9634, zoom=17, highlight_name=None):
+    """Create a Folium map with highlighted location"""
+    m = _build_base_map(center_lat, center_lon, zoom, highlight_name)
+    if not highlight_name:
+        return m
+    
+    highlight = folium.FeatureGroup(name="Highlight", control=False)
+    name, lat, lon, typ, radius, popup = MARKERS[NAME_TO_IDX[highlight_name.lower()]]
+    
+    # Add highlight circle
+    folium.Circle(
+        location=[lat, lon],
+        radius=radius,
+        color='#FFD700',
+        fill=True,
+        fillColor='#FFD700',
+        fillOpacity=0.3,
+        weight=2
+    ).add_to(highlight)
+    
+    # Add the pulse animation once to the map document, then the glowing marker
+    m.get_root().header.add_child(folium.Element(PULSE_CSS))
+    folium.Marker(
+        [lat, lon],
+        popup=popup,
+        tooltip=name,
+        icon=DivIcon(html=GLOW_ICON_HTML)
+    ).add_to(highlight)
+    
+    highlight.add_to(m)
+    
+    return m
+
+def _render_map_html(highlight_name=None):
+    """Render the map for a highlighted location (or the default view) to HTML"""
+    if highlight_name:
+        name, lat, lon, typ, radius, popup = MARKERS[NAME_TO_IDX[highlight_name.lower()]]
+        m = create_map(lat, lon, zoom=18, highlight_name=highlight_name)
+    else:
+        m = create_map()
+    return m.get_root().render()
+
+@st.cache_resource
+def _all_map_html():
+    """Pre-render the default map and one highlighted map per location"""
+    maps = {None: _render_map_html()}
+    for name, *_ in MARKERS:
+        maps[name] = _render_map_html(name)
+    return maps
+
 def main():
     # Title and description
     st.title("🗺 Dedan Kimathi University Navigation System")
     
-    # Initialize session state for highlighted location if not exists
-    if 'highlighted_location' not in st.session_state:
-        st.session_state.highlighted_location = None
-    
     # Create sidebar for controls
     with st.sidebar:
         st.header("Navigation Controls")
@@ -154,19 +223,14 @@ def main():
         st.subheader("🏢 Filter by Type")
         selected_type = st.selectbox(
             "Select location type",
-            ["All"] + list(locations['type'].unique())
+            ["All"] + list(dict.fromkeys(TYPES))
         )
         
         # Show location list
         st.subheader("📍 All Locations")
-        if selected_type != "All":
-            filtered_locations = locations[locations['type'] == selected_type]
-        else:
-            filtered_locations = locations
-        
         selected_location = st.selectbox(
             "Select a location to view",
-            filtered_locations['name']
+            _filter_by_type(selected_type)
         )
 
     # Initialize highlight_name based on search or selection
@@ -174,78 +238,52 @@ def main():
     
     # Update highlighted location based on search or selection
     if search_term:
-        found_locations = locations[
-            locations['name'].str.lower().str.contains(search_term.lower())
-        ]
-        if not found_locations.empty:
-            highlight_name = found_locations.iloc[0]['name']
-            st.session_state.highlighted_location = highlight_name
-            map_center = (
-                found_locations.iloc[0]['latitude'],
-                found_locations.iloc[0]['longitude']
-            )
-            m = create_map(map_center[0], map_center[1], zoom=18, 
-                           highlight_name=st.session_state.highlighted_location)
-        else:
-            st.session_state.highlighted_location = None
-            m = create_map()
+        matches = search_locations(search_term)
+        if matches:
+            highlight_name = NAMES[matches[0]]
     elif selected_location:
         highlight_name = selected_location
-        st.session_state.highlighted_location = highlight_name
-        loc = locations[locations['name'] == selected_location].iloc[0]
-        m = create_map(loc['latitude'], loc['longitude'], zoom=18, 
-                       highlight_name=st.session_state.highlighted_location)
-    else:
-        st.session_state.highlighted_location = None
-        m = create_map()
 
     # Create two columns for map and info
     col1, col2 = st.columns([7, 3])
     
     with col1:
         # Display the map
-        folium_static(m, width=800, height=600)
+        components.html(_all_map_html()[highlight_name], width=800, height=600)
 
     with col2:
         # Information panel
         st.subheader("📌 Location Information")
         if selected_location:
-            loc = locations[locations['name'] == selected_location].iloc[0]
-            st.write(f"*Name:* {loc['name']}")
-            st.write(f"*Type:* {loc['type']}")
-            st.write(f"*Coordinates:* ({loc['latitude']:.4f}, {loc['longitude']:.4f})")
+            i = NAME_TO_IDX[selected_location.lower()]
+            st.write(f"*Name:* {NAMES[i]}")
+            st.write(f"*Type:* {TYPES[i]}")
+            st.write(f"*Coordinates:* ({LATS[i]:.4f}, {LONS[i]:.4f})")
             
             # Calculate distances to other locations
             st.subheader("📏 Distances to Other Locations")
-            selected_coords = (loc['latitude'], loc['longitude'])
-            
-            distances = []
-            for idx, row in locations.iterrows():
-                if row['name'] != selected_location:
-                    target_coords = (row['latitude'], row['longitude'])
-                    distance = geodesic(selected_coords, target_coords).meters
-                    distances.append({
-                        'location': row['name'],
-                        'distance': f"{distance:.0f} meters"
-                    })
-            
-            distance_df = pd.DataFrame(distances)
+            distances = DIST[i]
+            others = np.arange(len(NAMES)) != i
+            distance_df = pd.DataFrame({
+                'location': NAMES[others],
+                'distance': [f"{distance:.0f} meters" for distance in distances[others]]
+            })
             st.dataframe(distance_df, hide_index=True)
 
     # Footer with instructions
     st.markdown("---")
-with st.expander("ℹ How to Use"):
-        # Footer with instructions
-    st.markdown("---")
-with st.expander("ℹ How to Use"):
-    st.markdown("""
-        1. *Search*: Use the search box in the sidebar to find specific locations
-        2. *Filter*: Filter locations by type using the dropdown
-        3. *Navigation*: Click on markers to see location details
-        4. *Highlighting*: Selected locations will be highlighted with the rest of the map dimmed
-        5. *Drawing*: Use the drawing tools on the left side of the map to:
-           - Mark custom points
-           - Draw paths
-           - Measure distances
-        6. *Location*: Use the location button to find your current position on the map
-    """)
+    with st.expander("ℹ How to Use"):
+        st.markdown("""
+            1. *Search*: Use the search box in the sidebar to find specific locations
+            2. *Filter*: Filter locations by type using the dropdown
+            3. *Navigation*: Click on markers to see location details
+            4. *Highlighting*: Selected locations will be highlighted with the rest of the map dimmed
+            5. *Drawing*: Use the drawing tools on the left side of the map to:
+               - Mark custom points
+               - Draw paths
+               - Measure distances
+            6. *Location*: Use the location button to find your current position on the map
+        """)
+
+if __name__ == "__main__":
+    main()